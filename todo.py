@@ -8,27 +8,67 @@
 
 
 
-from argparse import ArgumentParser
-
 from os.path import expanduser, join as pjoin, isfile, isdir, dirname
 from os import makedirs
 
-from re import match, compile as compile_regex
+try: # prefer Google's RE2 engine: linear-time matching, no pathological backtracking
+	import re2 as re_engine
+except ImportError:
+	import re as re_engine
 
 from datetime import datetime, timedelta
 
+from typing import Final, Iterable, Optional, Set
+
 import string
 
-import traceback
+
+TODO_FILE: Final = pjoin( expanduser("~"), "Documents", "todo.txt" )
+PRIORITY_PATTERN = re_engine.compile( r"\((?P<priority>[A-Z])\)\ " )
+DATE_PATTERN = re_engine.compile( r"(?P<date>\d{4}\-\d{2}\-\d{2})\ " )
+URGENT_TIME: Final = timedelta(days = 7)
+
+
+def _pdate(s: str) -> datetime:
+	# the date layout is fixed to YYYY-MM-DD, a slice parse skips the locale-aware strptime machinery
+	return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+def _fdate(d: datetime) -> str:
+	# equivalent of strftime("%y-%m-%d ") without the format-table traversal
+	return f"{d.year % 100:02d}-{d.month:02d}-{d.day:02d} "
+
+
+COLOR_CODES: Final = { 'black': 30, 'red': 31, 'green': 32, 'yellow': 33, 'blue': 34, 'magenta': 35, 'cyan': 36, 'white': 37 }
+
+def color(text, clr = None, bold = False) -> str:
+	codes = []
+	if bold: codes.append("1")
+	if clr in COLOR_CODES: codes.append(str(COLOR_CODES[clr]))
+	if not codes: return text
+	return "\033[" + ";".join(codes) + "m" + str(text) + "\033[0m"
 
 
-TODO_FILE = pjoin( expanduser("~"), "Documents", "todo.txt" )
-TODO_PATTERN = compile_regex( r"(?:(?P<later>\;\ )?(?:\((?P<priority>[A-Z])\)\ )?(?:\.(?P<due_date>\d{4}\-\d{2}\-\d{2})\ )?(?:(?P<creation_date>\d{4}\-\d{2}\-\d{2})\ )?(?P<todo>[^\:\+\n]*[^\:\+\ ])(?:\ \+(?P<project_name>[^\s\#]+)(?:\#(?P<project_seq>\d+))?)?(?P<tags>(?:\ \:[A-Z\_\d]+)*)?)|^(?P<comment>\;\;).*" )
-URGENT_TIME = timedelta(days = 7)
+# colored fragments that never change, built once at import
+_C_OPEN_PAREN = color("(", 'white')
+_C_CLOSE_PAREN = color(") ", 'white')
+_C_DOT = color(".", 'white')
+_C_SPACE_PLUS = " " + color("+", 'white')
+_C_SPACE_COLON = " " + color(":", 'white')
 
 
 class TodoTask:
-	def __init__(self, line, comment = False, prioritize = True):
+	later: Optional[bool]
+	priority: Optional[str]
+	due_date: Optional[datetime]
+	creation_date: Optional[datetime]
+	todo: Optional[str]
+	project_name: Optional[str]
+	project_seq: Optional[int]
+	tags: Set[str]
+	comment: bool
+	text: str
+
+	def __init__(self, line: str, comment: bool = False, prioritize: bool = True, now: Optional[datetime] = None, urgent_cutoff: Optional[datetime] = None):
 		line = line.strip()
 		if comment or line.startswith(";; "):
 			self.later = None
@@ -42,28 +82,56 @@ class TodoTask:
 			self.comment = True
 			self.text = line if line.startswith(";; ") else ";; " + line
 		else:
-			tm = match(TODO_PATTERN, line)
-			if not tm: raise RuntimeError(f"Malformed task: {line}")
-			
-			self.tags = set([ t.strip() for t in tm.group('tags').split(':')[1:] if t ] if tm.group('tags') else [])
-			
-			self.due_date = datetime.strptime(tm.group('due_date'), "%Y-%m-%d") if tm.group('due_date') else None
-			if self.due_date and self.due_date < datetime.now(): self.tags.add("OVERDUE")
+			if now is None: now = datetime.now()
+			if urgent_cutoff is None: urgent_cutoff = now + URGENT_TIME
+
+			later_marker = line.startswith("; ")
+			if later_marker: line = line[2:]
+
+			pm = PRIORITY_PATTERN.match(line)
+			i = pm.end() if pm else 0
+
+			due_date = None
+			if line.startswith(".", i):
+				dm = DATE_PATTERN.match(line, i + 1)
+				if dm:
+					due_date = dm.group('date')
+					i = dm.end()
+
+			cm = DATE_PATTERN.match(line, i)
+			if cm: i = cm.end()
+
+			tail = line[i:]
+
+			tail, _, tag_tail = tail.partition(" :")
+			self.tags = { t.strip() for t in tag_tail.split(" :") if t.strip() } if tag_tail else set()
+
+			self.due_date = _pdate(due_date) if due_date else None
+			if self.due_date and self.due_date < now: self.tags.add("OVERDUE")
 
-			self.priority = tm.group('priority')
+			self.priority = pm.group('priority') if pm else None
 			if "OVERDUE" in self.tags:
 				self.priority = "A"
-			elif self.due_date and self.due_date - datetime.now() < URGENT_TIME and self.priority != "A" and self.priority != "B":
+			elif self.due_date and self.due_date < urgent_cutoff and self.priority != "A" and self.priority != "B":
 				self.priority = "C"
-			
-			self.creation_date = datetime.strptime(tm.group('creation_date'), "%Y-%m-%d") if tm.group('creation_date') else datetime.now()
-			
-			self.todo = tm.group('todo').capitalize()
-			
-			self.project_name = tm.group('project_name')
-			self.project_seq = int(tm.group('project_seq')) if tm.group('project_seq') else 0
-			
-			if tm.group('later'):
+
+			self.creation_date = _pdate(cm.group('date')) if cm else now
+
+			head, project_sep, project = tail.rpartition(" +")
+			if project_sep:
+				tail = head
+				name, _, seq = project.partition("#")
+				if not name or " " in name or (seq and not seq.isdigit()): raise RuntimeError(f"Malformed task: {line}")
+				self.project_name = name
+				self.project_seq = int(seq) if seq else 0
+			else:
+				self.project_name = None
+				self.project_seq = 0
+
+			if not tail.strip(): raise RuntimeError(f"Malformed task: {line}")
+			self.todo = tail.capitalize()
+
+			if later_marker:
 				self.later = True
 				self.tags.add("LATER")
 			elif self.tags.intersection({"LATER", "WAITING"}):
@@ -75,50 +143,60 @@ class TodoTask:
 			
 			self.text = make_todo(self.todo, self.due_date, self.priority, self.creation_date, self.project_name, self.project_seq, self.tags)
 
-	def __str__(self):
+		# identity key and hash are immutable after parsing, compute them once
+		self._key = ( self.due_date, self.todo.strip().lower() if self.todo else self.text )
+		self._hash = hash(self._key)
+
+	def __str__(self) -> str:
 		return self.text
 
-	def __hash__(self):
-		return hash( (self.due_date, self.todo.strip().lower() if self.todo else self.text) )
+	def __hash__(self) -> int:
+		return self._hash
+
+	def __eq__(self, other) -> bool:
+		return isinstance(other, TodoTask) and self._key == other._key
 
-	def __eq__(self, other):
-		return self.__hash__() == other.__hash__()
+	def __lt__(self, other) -> bool:
+		# tasks sort by their rendered text, through the type's C-level compare slot
+		return self.text < other.text
 
-	def colored(self):
+	def colored(self) -> str:
 		if self.comment or self.later: return color(self.text, 'white')
 
-		ts = ""
+		parts = []
+		append = parts.append
 		if self.priority:
-			ts += color("(", 'white') 
+			append(_C_OPEN_PAREN)
 			if self.priority == 'A': pcolor = 'red'
 			elif self.priority == 'B' or self.priority == 'C': pcolor = 'yellow'
 			else: pcolor = 'green'
-			ts += color(self.priority, pcolor, bold = True) 
-			ts += color(") ", 'white')
+			append(color(self.priority, pcolor, bold = True))
+			append(_C_CLOSE_PAREN)
 		if self.due_date:
-			ts += color(".", 'white')
-			ts += color(self.due_date.strftime("%y-%m-%d "), 'magenta', bold = True)
+			append(_C_DOT)
+			append(color(_fdate(self.due_date), 'magenta', bold = True))
 		#if self.creation_date:
-		ts += color(self.creation_date.strftime("%y-%m-%d "), 'white')
-		ts += color(self.todo, bold = True)
+		append(color(_fdate(self.creation_date), 'white'))
+		append(color(self.todo, bold = True))
 		if self.project_name:
-			ts += " " + color("+", 'white') + color(self.project_name, 'blue')
-			if self.project_seq: ts += color("#" + str(self.project_seq), 'cyan')
-		if self.tags:
-			for tag in self.tags:
-				ts += " " + color(":", 'white') + ( color(tag, 'red') if tag == "OVERDUE" else color(tag, 'green') )
-
-		return ts
+			append(_C_SPACE_PLUS)
+			append(color(self.project_name, 'blue'))
+			if self.project_seq: append(color("#" + str(self.project_seq), 'cyan'))
+		for tag in self.tags:
+			append(_C_SPACE_COLON)
+			append(color(tag, 'red') if tag == "OVERDUE" else color(tag, 'green'))
+
+		return "".join(parts)
 		
 
-def make_todo(todo, due_date = None, priority = None, creation_date = datetime.now(), project_name = None, project_seq = None, tags = set()):
+def make_todo(todo: str, due_date: Optional[datetime] = None, priority: Optional[str] = None, creation_date: Optional[datetime] = datetime.now(), project_name: Optional[str] = None, project_seq: Optional[int] = None, tags: Set[str] = set()) -> str:
 	todo_string = ""
 	if tags.intersection({"LATER", "WAITING"}): todo_string += "; "
 	if priority and priority in string.ascii_uppercase: todo_string += "(" + priority + ")" + " "
-	if due_date and type(due_date) == datetime:
-		todo_string += due_date.strftime(".%y-%m-%d ")
-	if creation_date and type(creation_date) == datetime:
-		todo_string += creation_date.strftime("%y-%m-%d ")
+	if isinstance(due_date, datetime):
+		todo_string += "." + _fdate(due_date)
+	if isinstance(creation_date, datetime):
+		todo_string += _fdate(creation_date)
 	if not todo.strip(): raise RuntimeError( "Empty todo task" )
 	todo_string += todo.capitalize()
 	if project_name:
@@ -132,36 +210,34 @@ def make_todo(todo, due_date = None, priority = None, creation_date = datetime.n
 	return todo_string
 
 
-def get_tasks(filepath):
-	tf = open(filepath, 'r')
-	lines = tf.readlines()
-	tf.close()
+def get_tasks(filepath: str) -> Set[TodoTask]:
+	now = datetime.now()
+	urgent_cutoff = now + URGENT_TIME
 
 	todos = set()
-	for l in lines:
-		try:
-			todos.add(TodoTask(l))
-		except RuntimeError:
-			print(color( f"This line will be commented because is not well formatted: {l.strip()}" , 'yellow'))
-			todos.add(TodoTask(l, comment = True))
+	with open(filepath, 'r', buffering = 1 << 16) as tf:
+		for l in tf: # stream the file, no intermediate list of lines
+			try:
+				todos.add(TodoTask(l, now = now, urgent_cutoff = urgent_cutoff))
+			except RuntimeError:
+				print(color( f"This line will be commented because is not well formatted: {l.strip()}" , 'yellow'))
+				todos.add(TodoTask(l, comment = True))
 
 	return todos
 
 
-def list(projects = [], tags = []):
+def cmd_list(projects: Optional[Iterable[str]] = None, tags: Optional[Iterable[str]] = None) -> None:
 	tasks = get_tasks(args.file)
 
-	if tags:
-		for task in set(tasks):
-			if len( task.tags.intersection(set(tags)) ) <= 0: tasks.discard(task)
-
-	tasks = sorted(tasks, key = lambda x: x.text)
+	tagset = frozenset(tags or ())
+	if tagset:
+		tasks = { t for t in tasks if t.tags & tagset }
 
-	for t in tasks:
+	for t in sorted(tasks):
 		print( t.colored() )
 
 
-def add(*tasks):
+def add(*tasks: str) -> bool:
 	todos = get_tasks(args.file)
 
 	for task in tasks:
@@ -173,40 +249,49 @@ def add(*tasks):
 			print(color("Malformed task.", 'red'))
 			continue
 
-	todos = sorted(todos, key = lambda x: x.text)
-
-	tf = open(args.file, 'w')
-	for t in todos:
-		tf.write( f"{t}\n" )
-	tf.close()
+	out = [ f"{t}\n" for t in sorted(todos) ]
+	with open(args.file, 'w') as tf:
+		tf.writelines(out)
 
 	return True
 
 
-# Parse arguments
-parser = ArgumentParser(description = "Organize your todos")
-parser.add_argument('action', choices = ['add', 'list', 'correct'], help = "Select what you want to do")
-parser.add_argument('-t', '--task', action = 'append', dest = 'tasks', help = "The input tasks")
-parser.add_argument('-f', '--file', default = TODO_FILE, help = "Todo.txt file to use")
-tasks_filters = parser.add_argument_group("Tasks filters")
-tasks_filters.add_argument('--tag', dest = 'tags', action = 'append', help = "Filter only specific tags (not case sensitive)")
-args = parser.parse_args()
-
-# Initial checks
-if not isfile(args.file):
-	if not isdir(dirname(args.file)): makedirs(dirname(args.file))
-	open(args.file,  'a').close() # use 'a' as precaution
-print( f"Selected todo.txt file: {args.file}" )
-
-# Program start
-try:
-	if args.action == 'add':
-		add(*args.tasks)
-	elif args.action == 'list':
-		list(tags = args.tags)
-except Exception:
-	print(color(traceback.format_exc(), 'red'))
-	exit(1)
-except KeyboardInterrupt:
-	print(color("\nInterrupted!", 'yellow'))
-	exit(2)
\ No newline at end of file
+def main() -> None:
+	# argparse and traceback are only needed by the CLI entrypoint,
+	# keep them out of the module import path
+	from argparse import ArgumentParser
+	import traceback
+
+	global args
+
+	# Parse arguments
+	parser = ArgumentParser(description = "Organize your todos")
+	parser.add_argument('action', choices = ['add', 'list', 'correct'], help = "Select what you want to do")
+	parser.add_argument('-t', '--task', action = 'append', dest = 'tasks', help = "The input tasks")
+	parser.add_argument('-f', '--file', default = TODO_FILE, help = "Todo.txt file to use")
+	tasks_filters = parser.add_argument_group("Tasks filters")
+	tasks_filters.add_argument('--tag', dest = 'tags', action = 'append', help = "Filter only specific tags (not case sensitive)")
+	args = parser.parse_args()
+
+	# Initial checks
+	if not isfile(args.file):
+		if not isdir(dirname(args.file)): makedirs(dirname(args.file))
+		open(args.file,  'a').close() # use 'a' as precaution
+	print( f"Selected todo.txt file: {args.file}" )
+
+	# Program start
+	try:
+		if args.action == 'add':
+			add(*args.tasks)
+		elif args.action == 'list':
+			cmd_list(tags = args.tags)
+	except Exception:
+		print(color(traceback.format_exc(), 'red'))
+		exit(1)
+	except KeyboardInterrupt:
+		print(color("\nInterrupted!", 'yellow'))
+		exit(2)
+
+
+if __name__ == "__main__":
+	main()
\ No newline at end of file
@@ -0,0 +1,14 @@
+#! /usr/bin/env python3
+
+###
+# File: todo_cli.py
+#
+# Thin interpreted entrypoint: keeps argparse and dispatch out of todo.py
+# so the parsing module can be compiled ahead of time (mypyc todo.py).
+###
+
+from todo import main
+
+
+if __name__ == "__main__":
+	main()